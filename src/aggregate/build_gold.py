@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 import os
+import random
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional
 
-from neo4j import Driver, GraphDatabase
-from neo4j.work.simple import Session  # type: ignore[attr-defined]
+import pandas as pd
+from neo4j import Driver, GraphDatabase, ManagedTransaction, Session
 
 
 def env(name: str, default: str) -> str:
@@ -18,6 +20,88 @@ NEO4J_USER: str = env("NEO4J_USER", "neo4j")
 NEO4J_PASSWORD: str = env("NEO4J_PASSWORD", "neo4jpassword")
 NEO4J_DATABASE: str = env("NEO4J_DATABASE", "neo4j")
 
+FETCH_SIZE: int = 10_000
+WRITE_BATCH: int = 5_000
+
+FLIGHT_INDEX_PROPS: List[str] = ["origin", "dest", "op_carrier", "fl_date"]
+ROUTE_SUMMARY_INDEX_PROPS: List[str] = ["flights", "avg_arr_delay"]
+
+GOLD_SCHEMA: List[str] = [
+    """
+    CREATE CONSTRAINT route_summary_unique IF NOT EXISTS
+    FOR (r:RouteSummary)
+    REQUIRE (r.origin, r.dest) IS UNIQUE;
+    """,
+    """
+    CREATE CONSTRAINT daily_carrier_unique IF NOT EXISTS
+    FOR (d:DailyCarrierSummary)
+    REQUIRE (d.carrier, d.date) IS UNIQUE;
+    """,
+    """
+    CREATE CONSTRAINT monthly_airport_unique IF NOT EXISTS
+    FOR (m:MonthlyAirportSummary)
+    REQUIRE (m.airport, m.month) IS UNIQUE;
+    """,
+    *(f"CREATE INDEX flight_{prop} IF NOT EXISTS FOR (f:Flight) ON (f.{prop});" for prop in FLIGHT_INDEX_PROPS),
+    # Range indexes for the dashboard's top-routes filter and ORDER BY ... LIMIT
+    *(
+        f"CREATE RANGE INDEX route_summary_{prop} IF NOT EXISTS FOR (r:RouteSummary) ON (r.{prop});"
+        for prop in ROUTE_SUMMARY_INDEX_PROPS
+    ),
+]
+
+GOLD_WORKERS: int = int(env("GOLD_WORKERS", "4"))
+
+# The Flight scan is partitioned by carrier so every partition is an index
+# seek on flight_op_carrier. Listing the carriers (IS NOT NULL) is an index
+# scan too. Flights without op_carrier can only be found by a label scan, so
+# that extra partition is planned only when the counts show such flights exist.
+FLIGHT_CARRIERS = """
+MATCH (f:Flight)
+WHERE f.op_carrier IS NOT NULL
+RETURN f.op_carrier AS carrier, count(*) AS n;
+"""
+
+# Only the properties the gold summaries need; dates come back as YYYY-MM-DD strings
+FLIGHT_RETURN = """
+RETURN f.origin AS origin,
+       f.dest AS dest,
+       f.op_carrier AS carrier,
+       CASE WHEN f.fl_date IS NULL THEN NULL ELSE toString(date(f.fl_date)) END AS date,
+       f.dep_delay AS dep_delay,
+       f.arr_delay AS arr_delay,
+       f.cancelled AS cancelled;
+"""
+
+FLIGHT_SCAN_CARRIER = "MATCH (f:Flight) WHERE f.op_carrier = $carrier" + FLIGHT_RETURN
+FLIGHT_SCAN_NO_CARRIER = "MATCH (f:Flight) WHERE f.op_carrier IS NULL" + FLIGHT_RETURN
+
+ROUTE_MERGE = """
+UNWIND $rows AS row
+MERGE (r:RouteSummary {origin: row.origin, dest: row.dest})
+SET r.flights = row.flights,
+    r.avg_arr_delay = row.avg_arr_delay,
+    r.avg_dep_delay = row.avg_dep_delay
+RETURN count(r) AS created_or_updated;
+"""
+
+DAILY_MERGE = """
+UNWIND $rows AS row
+MERGE (d:DailyCarrierSummary {carrier: row.carrier, date: date(row.date)})
+SET d.avg_dep_delay = row.avg_dep_delay,
+    d.flights = row.flights
+RETURN count(d) AS created_or_updated;
+"""
+
+MONTHLY_MERGE = """
+UNWIND $rows AS row
+MERGE (m:MonthlyAirportSummary {airport: row.airport, month: row.month})
+SET m.avg_dep_delay = row.avg_dep_delay,
+    m.cancel_rate = row.cancel_rate,
+    m.flights = row.flights
+RETURN count(m) AS created_or_updated;
+"""
+
 
 def get_driver() -> Driver:
     return GraphDatabase.driver(
@@ -26,16 +110,22 @@ def get_driver() -> Driver:
     )
 
 
-def wait_for_neo4j(driver: Driver, attempts: int = 15, sleep_s: float = 2.0) -> None:
+def wait_for_neo4j(driver: Driver, attempts: int = 15, max_delay_s: float = 4.0) -> None:
+    # Exponential backoff with jitter: quick on a warm server, gentle on a cold start.
+    # Each sleep (jitter included) is capped at max_delay_s and none follows the
+    # last attempt, so the defaults wait at most 0.25+0.5+1+2+4*10 = ~44 s.
     last_err: Optional[Exception] = None
-    for _ in range(attempts):
+    delay = 0.25
+    for attempt in range(attempts):
         try:
             driver.verify_connectivity()
             print("✅ Neo4j connectivity OK")
             return
         except Exception as e:
             last_err = e
-            time.sleep(sleep_s)
+            if attempt + 1 < attempts:
+                time.sleep(min(delay + random.uniform(0, delay * 0.5), max_delay_s))
+                delay = min(delay * 2, max_delay_s)
 
     # mypy-safe: ensure last_err is not None before raising "from"
     if last_err is None:
@@ -43,9 +133,124 @@ def wait_for_neo4j(driver: Driver, attempts: int = 15, sleep_s: float = 2.0) ->
     raise RuntimeError(f"Neo4j not reachable after retries. Last error: {last_err}") from last_err
 
 
+def _run_all(tx: ManagedTransaction, queries: List[str]) -> None:
+    for q in queries:
+        tx.run(q).consume()
+
+
+def _single(tx: ManagedTransaction, query: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    record = tx.run(query, params).single()
+    return record.data() if record is not None else None
+
+
 def run_cypher(session: Session, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-    result = session.run(query, params or {})
-    return [r.data() for r in result]
+    # Managed read transaction: results must be consumed inside the transaction function
+    return session.execute_read(lambda tx: tx.run(query, params or {}).data())
+
+
+def run_single(session: Session, query: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    # For single-row aggregates: skips building a list of records
+    return session.execute_read(_single, query, params or {})
+
+
+def plan_partitions(carrier_counts: Dict[str, int], flight_n: int) -> List[Optional[str]]:
+    """
+    One partition per carrier, plus None (flights without op_carrier) only if
+    the carrier counts do not already account for every Flight.
+    """
+    partitions: List[Optional[str]] = list(carrier_counts)
+    if sum(carrier_counts.values()) < flight_n:
+        partitions.append(None)
+    return partitions
+
+
+def fetch_flights(session: Session, carrier: Optional[str]) -> pd.DataFrame:
+    """
+    Flights of one partition: a carrier code, or carrier=None for flights without op_carrier.
+    """
+    query = FLIGHT_SCAN_NO_CARRIER if carrier is None else FLIGHT_SCAN_CARRIER
+    df = session.execute_read(lambda tx: tx.run(query, {"carrier": carrier}).to_df())
+    for c in ("dep_delay", "arr_delay", "cancelled"):
+        df[c] = pd.to_numeric(df[c], errors="coerce")
+    return df
+
+
+def summarize_base(flights: pd.DataFrame) -> pd.DataFrame:
+    """
+    Finest-grain pre-aggregate (origin, dest, carrier, date) holding flight counts
+    and delay/cancel sums. Every gold summary is a roll-up of this frame, using
+    `flights` as the weight, so the raw rows are only grouped once.
+    """
+    df = flights.assign(
+        dep_delay=flights["dep_delay"].fillna(0.0),
+        arr_delay=flights["arr_delay"].fillna(0.0),
+        cancelled=(flights["cancelled"].fillna(0) == 1).astype(float),
+    )
+    return (
+        df.groupby(["origin", "dest", "carrier", "date"], sort=False, dropna=False)
+        .agg(
+            flights=("dep_delay", "size"),
+            sum_dep_delay=("dep_delay", "sum"),
+            sum_arr_delay=("arr_delay", "sum"),
+            cancelled=("cancelled", "sum"),
+        )
+        .reset_index()
+    )
+
+
+def fetch_base(driver: Driver, carrier: Optional[str]) -> pd.DataFrame:
+    # Runs on a worker thread: every partition gets its own session
+    with driver.session(database=NEO4J_DATABASE, fetch_size=FETCH_SIZE) as session:
+        return summarize_base(fetch_flights(session, carrier))
+
+
+def summarize_routes(base: pd.DataFrame) -> pd.DataFrame:
+    g = (
+        base.dropna(subset=["origin", "dest"])
+        .groupby(["origin", "dest"], sort=False)[["flights", "sum_arr_delay", "sum_dep_delay"]]
+        .sum()
+        .reset_index()
+    )
+    return g.assign(
+        avg_arr_delay=g["sum_arr_delay"] / g["flights"],
+        avg_dep_delay=g["sum_dep_delay"] / g["flights"],
+    )[["origin", "dest", "flights", "avg_arr_delay", "avg_dep_delay"]]
+
+
+def summarize_daily(base: pd.DataFrame) -> pd.DataFrame:
+    g = (
+        base.dropna(subset=["carrier", "date"])
+        .groupby(["carrier", "date"], sort=False)[["flights", "sum_dep_delay"]]
+        .sum()
+        .reset_index()
+    )
+    return g.assign(avg_dep_delay=g["sum_dep_delay"] / g["flights"])[
+        ["carrier", "date", "avg_dep_delay", "flights"]
+    ]
+
+
+def summarize_monthly(base: pd.DataFrame) -> pd.DataFrame:
+    df = base.dropna(subset=["origin", "date"])
+    # month is functionally dependent on date, so it is derived here rather than grouped on earlier
+    df = df.assign(airport=df["origin"], month=df["date"].str.slice(0, 7))
+    g = (
+        df.groupby(["airport", "month"], sort=False)[["flights", "sum_dep_delay", "cancelled"]]
+        .sum()
+        .reset_index()
+    )
+    return g.assign(
+        avg_dep_delay=g["sum_dep_delay"] / g["flights"],
+        cancel_rate=g["cancelled"] / g["flights"],
+    )[["airport", "month", "avg_dep_delay", "cancel_rate", "flights"]]
+
+
+def write_summary(session: Session, query: str, summary: pd.DataFrame, batch_size: int = WRITE_BATCH) -> int:
+    rows = summary.to_dict(orient="records")
+    written = 0
+    for i in range(0, len(rows), batch_size):
+        res = session.execute_write(_single, query, {"rows": rows[i : i + batch_size]})
+        written += int(res["created_or_updated"]) if res else 0
+    return written
 
 
 def main() -> None:
@@ -54,100 +259,49 @@ def main() -> None:
     try:
         wait_for_neo4j(driver)
 
-        with driver.session(database=NEO4J_DATABASE) as session:
+        with driver.session(database=NEO4J_DATABASE, fetch_size=FETCH_SIZE) as session:
             # ---------- Verify source data ----------
-            cnt = run_cypher(session, "MATCH (f:CleanFlight) RETURN count(f) AS n;")
-            clean_n = int(cnt[0]["n"]) if cnt else 0
+            cnt = run_single(session, "MATCH (f:CleanFlight) RETURN count(f) AS n;")
+            clean_n = int(cnt["n"]) if cnt else 0
             print(f"✅ CleanFlight rows: {clean_n}")
 
-            # ---------- Create constraints ----------
-            session.run(
-                """
-                CREATE CONSTRAINT route_summary_unique IF NOT EXISTS
-                FOR (r:RouteSummary)
-                REQUIRE (r.origin, r.dest) IS UNIQUE;
-                """
-            ).consume()
+            # ---------- Create constraints and indexes ----------
+            # One schema transaction: a single commit instead of one per statement
+            session.execute_write(_run_all, GOLD_SCHEMA)
             print("✅ Constraint ensured: (RouteSummary.origin, RouteSummary.dest) unique")
-
-            session.run(
-                """
-                CREATE CONSTRAINT daily_carrier_unique IF NOT EXISTS
-                FOR (d:DailyCarrierSummary)
-                REQUIRE (d.carrier, d.date) IS UNIQUE;
-                """
-            ).consume()
             print("✅ Constraint ensured: (DailyCarrierSummary.carrier, DailyCarrierSummary.date) unique")
-
-            session.run(
-                """
-                CREATE CONSTRAINT monthly_airport_unique IF NOT EXISTS
-                FOR (m:MonthlyAirportSummary)
-                REQUIRE (m.airport, m.month) IS UNIQUE;
-                """
-            ).consume()
             print("✅ Constraint ensured: (MonthlyAirportSummary.airport, MonthlyAirportSummary.month) unique")
+            print(f"✅ Indexes ensured on Flight: {', '.join(FLIGHT_INDEX_PROPS)}")
+            print(f"✅ Indexes ensured on RouteSummary: {', '.join(ROUTE_SUMMARY_INDEX_PROPS)}")
 
             # ---------- Gold aggregates ----------
+            # Carrier partitions are scanned and pre-aggregated concurrently; base groups are
+            # keyed by carrier, so concatenating them loses nothing and roll-ups combine by sums.
+            total = run_single(session, "MATCH (f:Flight) RETURN count(f) AS n;")
+            flight_n = int(total["n"]) if total else 0
+            carrier_counts = {r["carrier"]: int(r["n"]) for r in run_cypher(session, FLIGHT_CARRIERS)}
+            partitions = plan_partitions(carrier_counts, flight_n)
+            with ThreadPoolExecutor(max_workers=GOLD_WORKERS) as executor:
+                bases = list(executor.map(lambda c: fetch_base(driver, c), partitions))
+            base = pd.concat(bases, ignore_index=True)
 
-            # RouteSummary
-            route_res = run_cypher(
-                session,
-                """
-                MATCH (f:Flight)
-                WHERE f.origin IS NOT NULL AND f.dest IS NOT NULL
-                WITH f.origin AS o, f.dest AS d,
-                     count(*) AS flights,
-                     avg(coalesce(f.arr_delay, 0.0)) AS avg_arr_delay,
-                     avg(coalesce(f.dep_delay, 0.0)) AS avg_dep_delay
-                MERGE (r:RouteSummary {origin:o, dest:d})
-                SET r.flights = flights,
-                    r.avg_arr_delay = avg_arr_delay,
-                    r.avg_dep_delay = avg_dep_delay
-                RETURN count(r) AS created_or_updated;
-                """,
+            # Partitions must cover every Flight exactly once
+            if int(base["flights"].sum()) != flight_n:
+                raise RuntimeError(
+                    f"Carrier partitions covered {int(base['flights'].sum())} of {flight_n} Flight nodes"
+                )
+            print(
+                f"✅ Flight rows aggregated: {int(base['flights'].sum())} "
+                f"({len(partitions)} carrier partitions, {len(base)} base groups)"
             )
-            route_n = int(route_res[0]["created_or_updated"]) if route_res else 0
+
+            route_n = write_summary(session, ROUTE_MERGE, summarize_routes(base))
             print(f"✅ Gold build: RouteSummary created/updated = {route_n}")
 
-            # DailyCarrierSummary
-            daily_res = run_cypher(
-                session,
-                """
-                MATCH (f:Flight)
-                WHERE f.op_carrier IS NOT NULL AND f.fl_date IS NOT NULL
-                WITH f.op_carrier AS carrier,
-                     date(f.fl_date) AS dt,
-                     avg(coalesce(f.dep_delay, 0.0)) AS avg_dep_delay,
-                     count(*) AS flights
-                MERGE (d:DailyCarrierSummary {carrier: carrier, date: dt})
-                SET d.avg_dep_delay = avg_dep_delay,
-                    d.flights = flights
-                RETURN count(d) AS created_or_updated;
-                """,
-            )
-            daily_n = int(daily_res[0]["created_or_updated"]) if daily_res else 0
+            daily_n = write_summary(session, DAILY_MERGE, summarize_daily(base))
             print(f"✅ Gold build: DailyCarrierSummary created/updated = {daily_n}")
 
-            # MonthlyAirportSummary
-            monthly_res = run_cypher(
-                session,
-                """
-                MATCH (f:Flight)
-                WHERE f.origin IS NOT NULL AND f.fl_date IS NOT NULL
-                WITH f.origin AS airport,
-                     substring(toString(date(f.fl_date)), 0, 7) AS month,
-                     avg(coalesce(f.dep_delay, 0.0)) AS avg_dep_delay,
-                     avg(CASE WHEN coalesce(f.cancelled, 0) = 1 THEN 1.0 ELSE 0.0 END) AS cancel_rate,
-                     count(*) AS flights
-                MERGE (m:MonthlyAirportSummary {airport: airport, month: month})
-                SET m.avg_dep_delay = avg_dep_delay,
-                    m.cancel_rate = cancel_rate,
-                    m.flights = flights
-                RETURN count(m) AS created_or_updated;
-                """,
-            )
-            monthly_n = int(monthly_res[0]["created_or_updated"]) if monthly_res else 0
+            monthly_n = write_summary(session, MONTHLY_MERGE, summarize_monthly(base))
             print(f"✅ Gold build: MonthlyAirportSummary created/updated = {monthly_n}")
 
             print("✅ Gold layer build complete.")
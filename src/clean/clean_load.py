@@ -1,13 +1,58 @@
 from __future__ import annotations
 
+import csv
 import os
 import sys
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from datetime import date
 from typing import Any, Dict, Mapping, Optional, Union, Iterable
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 from neo4j import GraphDatabase
 
+from src.db.neo4j_conn import run_apoc_iterate
+
+
+# Persisted CleanFlight properties: the id plus what build_gold reads
+CLEAN_COLS: list[str] = [
+    "flight_id",
+    "fl_date",
+    "op_carrier",
+    "origin",
+    "dest",
+    "dep_delay",
+    "arr_delay",
+    "cancelled",
+]
+
+
+INT_COLS: tuple[str, ...] = ("cancelled",)
+FLOAT_COLS: tuple[str, ...] = ("dep_delay", "arr_delay")
+
+# apoc.periodic.iterate splits each chunk into batchSize sub-transactions
+# and commits them concurrently on the server. Columns arrive as parallel
+# lists (params: $cols, see build_clean_columns); the outer statement zips
+# them back into one map per row, so each inner batch only reads its own
+# rows via `row` and never indexes into the chunk-wide lists.
+CLEAN_OUTER: str = (
+    "UNWIND range(0, size($flight_id) - 1) AS i RETURN {"
+    + ", ".join(f"{c}: ${c}[i]" for c in CLEAN_COLS)
+    + "} AS row"
+)
+CLEAN_INNER: str = "MERGE (f:CleanFlight {flight_id: row.flight_id}) SET f += row SET f:Flight"
+CLEAN_CYPHER: str = f"""
+CALL apoc.periodic.iterate(
+  '{CLEAN_OUTER}',
+  '{CLEAN_INNER}',
+  {{batchSize: $batch_size, parallel: true, params: $cols}}
+)
+YIELD failedBatches, errorMessages
+RETURN failedBatches, errorMessages
+"""
+
 
 def build_flight_id(
     fl_date: Union[str, date, Mapping[str, Any]],
@@ -53,35 +98,120 @@ def build_flight_id(
     return f"{fl_date_str}|{carrier_str}|{origin_str}|{dest_str}-{crs_int:04d}"
 
 
+def build_flight_ids(df: pd.DataFrame) -> pd.Series:
+    """
+    Vectorized build_flight_id over a frame with fl_date, op_carrier, origin,
+    dest and crs_dep_time columns. Same output format, one string op per column
+    instead of per-row branching.
+    """
+    fl_date = df["fl_date"].astype(str).str.strip()
+    carrier = df["op_carrier"].astype(str).str.strip().str.upper()
+    origin = df["origin"].astype(str).str.strip().str.upper()
+    dest = df["dest"].astype(str).str.strip().str.upper()
+    crs = np.trunc(pd.to_numeric(df["crs_dep_time"])).astype(int).astype(str).str.zfill(4)
+    return fl_date + "|" + carrier + "|" + origin + "|" + dest + "-" + crs
+
+
 def norm_cols(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
+    # Renames in place: callers pass a freshly read chunk they own, so no data copy
     df.columns = [str(c).strip().lower() for c in df.columns]
     return df
 
 
-def pick(row: Mapping[str, Any], *keys: str) -> Optional[Any]:
+# Accepted header spellings for each clean column, in priority order.
+COLUMN_ALIASES: Dict[str, tuple[str, ...]] = {
+    "fl_date": ("fl_date", "flight_date", "flightdate"),
+    "op_carrier": ("op_carrier", "carrier", "unique_carrier"),
+    "op_carrier_fl_num": ("op_carrier_fl_num", "flight_num", "fl_num"),
+    "origin": ("origin", "origin_airport", "orig"),
+    "dest": ("dest", "destination", "dest_airport"),
+}
+
+
+def pick_col(df: pd.DataFrame, *keys: str) -> pd.Series:
+    """
+    First non-blank value per row across the given columns (header aliases).
+    """
+    out = pd.Series(None, index=df.index, dtype="object")
     for k in keys:
-        if k in row and pd.notna(row[k]) and str(row[k]).strip() != "":
-            return row[k]
-    return None
+        if k not in df.columns:
+            continue
+        col = df[k]
+        blank = col.isna() | (col.astype(str).str.strip() == "")
+        out = out.where(out.notna(), col.where(~blank))
+    return out
 
 
-def to_int(x: Any) -> Optional[int]:
-    if x is None or (isinstance(x, float) and pd.isna(x)):
-        return None
-    try:
-        return int(float(x))
-    except Exception:
-        return None
+def as_str(s: pd.Series) -> pd.Series:
+    # Mirrors str(x) on the row path, including "None" for missing values.
+    # The literal is filled explicitly: on pandas 3, astype(str) keeps None as NaN.
+    return s.astype(object).where(s.notna(), "None").map(str)
 
 
-def to_float(x: Any) -> Optional[float]:
-    if x is None or (isinstance(x, float) and pd.isna(x)):
-        return None
-    try:
-        return float(x)
-    except Exception:
-        return None
+def build_clean_frame(chunk: pd.DataFrame) -> pd.DataFrame:
+    out = pd.DataFrame({k: pick_col(chunk, *aliases) for k, aliases in COLUMN_ALIASES.items()})
+    out = out.dropna(subset=["origin", "dest"])
+    if out.empty:
+        return pd.DataFrame(columns=CLEAN_COLS)
+
+    chunk = chunk.loc[out.index]
+
+    fl_date = as_str(out["fl_date"])
+    op_carrier = as_str(out["op_carrier"])
+    op_carrier_fl_num = as_str(out["op_carrier_fl_num"])
+    origin = out["origin"].astype(str)
+    dest = out["dest"].astype(str)
+
+    out["flight_id"] = fl_date + "_" + op_carrier + "_" + op_carrier_fl_num + "_" + origin + "_" + dest
+    out["fl_date"] = fl_date
+    out["op_carrier"] = op_carrier
+    out["origin"] = origin.str.strip()
+    out["dest"] = dest.str.strip()
+
+    # Coercion happens here, in bulk; NA only becomes None at the output boundary
+    ints = pd.DataFrame({c: pick_col(chunk, c) for c in INT_COLS}).apply(pd.to_numeric, errors="coerce")
+    out[list(INT_COLS)] = np.trunc(ints.astype("float64")).astype("Int64")
+    floats = pd.DataFrame({c: pick_col(chunk, c) for c in FLOAT_COLS}).apply(pd.to_numeric, errors="coerce")
+    out[list(FLOAT_COLS)] = floats.astype("Float64")
+
+    return out[CLEAN_COLS]
+
+
+def build_clean_rows(chunk: pd.DataFrame) -> list[Dict[str, Any]]:
+    out = build_clean_frame(chunk)
+    return out.astype(object).where(out.notna(), None).to_dict(orient="records")
+
+
+def build_clean_columns(chunk: pd.DataFrame) -> Dict[str, list[Any]]:
+    """
+    Columnar form of build_clean_rows: one list per property, co-indexed by row.
+    Sent as-is, this avoids repeating every property key per row in the Bolt payload.
+    """
+    out = build_clean_frame(chunk)
+    return {c: out[c].astype(object).where(out[c].notna(), None).tolist() for c in CLEAN_COLS}
+
+
+def open_clean_csv(csv_path: str, block_size: int) -> pacsv.CSVStreamingReader:
+    """
+    Stream only the columns build_clean_rows can use, all read as strings
+    since header spellings vary between exports. Numeric coercion happens
+    later in pd.to_numeric.
+    """
+    with open(csv_path, newline="") as fh:
+        header = next(csv.reader(fh), [])
+
+    wanted = {k for aliases in COLUMN_ALIASES.values() for k in aliases} | set(CLEAN_COLS)
+    usecols = [c for c in header if str(c).strip().lower() in wanted]
+
+    return pacsv.open_csv(
+        csv_path,
+        read_options=pacsv.ReadOptions(block_size=block_size),
+        convert_options=pacsv.ConvertOptions(
+            column_types={c: pa.string() for c in usecols},
+            include_columns=usecols,
+            strings_can_be_null=True,
+        ),
+    )
 
 
 def main(csv_path: str) -> None:
@@ -90,7 +220,10 @@ def main(csv_path: str) -> None:
     password: str = os.getenv("NEO4J_PASSWORD", "neo4jpassword")
     database: str = os.getenv("NEO4J_DATABASE", "neo4j")
 
-    driver = GraphDatabase.driver(uri, auth=(user, password))
+    max_workers: int = int(os.getenv("CLEAN_WORKERS", "8"))
+
+    # One pooled connection per worker so concurrent sessions never wait on the pool
+    driver = GraphDatabase.driver(uri, auth=(user, password), max_connection_pool_size=max_workers)
 
     with driver.session(database=database) as s:
         s.run(
@@ -98,61 +231,35 @@ def main(csv_path: str) -> None:
             "FOR (f:CleanFlight) REQUIRE f.flight_id IS UNIQUE"
         )
 
-    chunk_size: int = int(os.getenv("CLEAN_CHUNK", "100000"))
-    batch_size: int = int(os.getenv("CLEAN_BATCH", "2000"))
+    block_size: int = int(os.getenv("CLEAN_BLOCK_BYTES", str(64 << 20)))
+    batch_size: int = int(os.getenv("CLEAN_BATCH", "1000"))
 
     total_inserted: int = 0
 
-    cypher: str = """
-    UNWIND $rows AS row
-    MERGE (f:CleanFlight {flight_id: row.flight_id})
-    SET f += row
-    SET f:Flight
-    """
+    def run_batch(cols: Dict[str, list[Any]]) -> int:
+        # Sessions are not thread-safe: each task gets its own (and its own connection)
+        with driver.session(database=database) as session:
+            run_apoc_iterate(session, CLEAN_CYPHER, "Clean load batch", cols=cols, batch_size=batch_size)
+        return len(cols["flight_id"])
+
+    pending: set[Future[int]] = set()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for batch in open_clean_csv(csv_path, block_size):
+            chunk = norm_cols(batch.to_pandas())
+
+            cols = build_clean_columns(chunk)
+            if not cols["flight_id"]:
+                continue
+
+            # Bound in-flight chunks so parsing cannot run ahead of the writers
+            if len(pending) >= max_workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                total_inserted += sum(f.result() for f in done)
+
+            pending.add(executor.submit(run_batch, cols))
 
-    with driver.session(database=database) as session:
-        for chunk in pd.read_csv(csv_path, chunksize=chunk_size, low_memory=False):
-            chunk = norm_cols(chunk)
-
-            rows: list[Dict[str, Any]] = []
-
-            for _, r in chunk.iterrows():
-                rec: Dict[str, Any] = r.to_dict()
-
-                fl_date = pick(rec, "fl_date", "flight_date", "flightdate")
-                op_carrier = pick(rec, "op_carrier", "carrier", "unique_carrier")
-                op_carrier_fl_num = pick(rec, "op_carrier_fl_num", "flight_num", "fl_num")
-                origin = pick(rec, "origin", "origin_airport", "orig")
-                dest = pick(rec, "dest", "destination", "dest_airport")
-
-                if origin is None or dest is None:
-                    continue
-
-                row: Dict[str, Any] = {
-                    "flight_id": f"{fl_date}_{op_carrier}_{op_carrier_fl_num}_{origin}_{dest}",
-                    "fl_date": str(fl_date),
-                    "op_carrier": str(op_carrier),
-                    "op_carrier_fl_num": str(op_carrier_fl_num),
-                    "origin": str(origin).strip(),
-                    "dest": str(dest).strip(),
-                    "crs_dep_time": to_int(pick(rec, "crs_dep_time")),
-                    "dep_time": to_int(pick(rec, "dep_time")),
-                    "dep_delay": to_float(pick(rec, "dep_delay")),
-                    "arr_delay": to_float(pick(rec, "arr_delay")),
-                    "cancelled": to_int(pick(rec, "cancelled")),
-                    "diverted": to_int(pick(rec, "diverted")),
-                }
-
-                rows.append(row)
-
-                if len(rows) >= batch_size:
-                    session.run(cypher, rows=rows).consume()
-                    total_inserted += len(rows)
-                    rows = []
-
-            if rows:
-                session.run(cypher, rows=rows).consume()
-                total_inserted += len(rows)
+        total_inserted += sum(f.result() for f in pending)
 
     driver.close()
     print(f"✅ Clean load completed. Total rows inserted: {total_inserted}")
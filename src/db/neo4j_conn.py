@@ -1,7 +1,36 @@
-from neo4j import GraphDatabase, Driver
+import atexit
+import os
+from functools import lru_cache
+from typing import Any
 
+from neo4j import GraphDatabase, Driver, Session
+
+@lru_cache(maxsize=1)
 def get_driver() -> Driver:
-    return GraphDatabase.driver(
+    """
+    Process-wide driver: created once, pooled, and closed at interpreter exit.
+    Callers should not close it themselves.
+    """
+    driver = GraphDatabase.driver(
         "bolt://localhost:7687",
-        auth=("neo4j", "neo4jpassword")
+        auth=("neo4j", "neo4jpassword"),
+        max_connection_pool_size=int(os.getenv("NEO4J_POOL", "32")),
+        connection_acquisition_timeout=60,
+        max_connection_lifetime=3600,
     )
+    atexit.register(driver.close)
+    return driver
+
+
+def run_apoc_iterate(session: Session, cypher: str, what: str, **params: Any) -> None:
+    """
+    Run an apoc.periodic.iterate CALL that yields failedBatches/errorMessages,
+    raising RuntimeError if any inner batch failed.
+
+    Auto-commit on purpose (session.run, not execute_write): apoc commits its
+    inner batches in transactions of its own, so a managed transaction adds no
+    atomicity, while a driver retry would replay batches already committed.
+    """
+    res = session.run(cypher, params).single()
+    if res is not None and res["failedBatches"]:
+        raise RuntimeError(f"{what} failed: {res['errorMessages']}")
@@ -1,6 +1,12 @@
+import queue
 import sys
-import pandas as pd
-from db.neo4j_conn import get_driver
+import threading
+from typing import Any, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+from db.neo4j_conn import get_driver, run_apoc_iterate
 
 # Columns that exist in YOUR data (from your header output)
 USECOLS = [
@@ -14,64 +20,159 @@ USECOLS = [
     "ARR_DELAY",
     "CANCELLED",
     "DIVERTED",
-    "DISTANCE",
 ]
 
-def main(csv_path: str, chunksize: int = 100_000) -> None:
+# Fixed types so Arrow does not re-infer (and disagree) block by block
+COLUMN_TYPES = {
+    "FL_DATE": pa.string(),
+    "OP_CARRIER": pa.string(),
+    "OP_CARRIER_FL_NUM": pa.int64(),
+    "ORIGIN": pa.string(),
+    "DEST": pa.string(),
+    "CRS_DEP_TIME": pa.int32(),
+    "DEP_DELAY": pa.float64(),
+    "ARR_DELAY": pa.float64(),
+    "CANCELLED": pa.float64(),
+    "DIVERTED": pa.float64(),
+}
+
+# BTS exports write FL_DATE as ISO or as US dates, the latter sometimes with a
+# midnight time suffix ("1/1/2018 12:00:00 AM"); the time part is dropped first
+FL_DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y")
+
+REQUIRED = ["FL_DATE", "OP_CARRIER", "ORIGIN", "DEST", "CRS_DEP_TIME"]
+
+RAW_CYPHER = """
+CALL apoc.periodic.iterate(
+  'UNWIND $rows AS r RETURN r',
+  'CREATE (:RawFlight {
+    fl_date: r.FL_DATE,
+    carrier: r.OP_CARRIER,
+    flight_num: toInteger(r.OP_CARRIER_FL_NUM),
+    origin: r.ORIGIN,
+    dest: r.DEST,
+    crs_dep_time: toInteger(r.CRS_DEP_TIME),
+    dep_delay: r.DEP_DELAY,
+    arr_delay: r.ARR_DELAY,
+    cancelled: toInteger(r.CANCELLED),
+    diverted: toInteger(r.DIVERTED)
+  })',
+  {batchSize: $batch_size, parallel: true, params: {rows: $rows}}
+)
+YIELD failedBatches, errorMessages
+RETURN failedBatches, errorMessages
+"""
+
+
+def parse_fl_date(col: Any) -> Any:
+    """
+    FL_DATE strings to date32, trying each of FL_DATE_FORMATS; unparseable values become null.
+    """
+    day = pc.replace_substring_regex(pc.utf8_trim_whitespace(col), r"\s.*$", "")
+    parsed = [pc.strptime(day, format=fmt, unit="s", error_is_null=True) for fmt in FL_DATE_FORMATS]
+    return pc.cast(pc.coalesce(*parsed), pa.date32())
+
+
+def clean_batch(batch: pa.RecordBatch) -> pa.Table:
+    tbl = pa.Table.from_batches([batch])
+
+    # --- Standardize / basic cleaning for RAW layer ---
+    tbl = tbl.set_column(tbl.schema.get_field_index("FL_DATE"), "FL_DATE", parse_fl_date(tbl["FL_DATE"]))
+
+    for col in ("OP_CARRIER", "ORIGIN", "DEST"):
+        idx = tbl.schema.get_field_index(col)
+        tbl = tbl.set_column(idx, col, pc.utf8_upper(pc.utf8_trim_whitespace(tbl[col])))
+
+    # Drop missing required fields (RAW still needs minimally valid records)
+    mask = pc.is_valid(tbl[REQUIRED[0]])
+    for col in REQUIRED[1:]:
+        mask = pc.and_(mask, pc.is_valid(tbl[col]))
+    return tbl.filter(mask)
+
+
+def main(csv_path: str, block_size: int = 64 << 20, batch_size: int = 1000, workers: int = 4) -> None:
+    """
+    Producer/consumer ingest: one thread parses and cleans CSV blocks while
+    `workers` threads, each with its own session, write them to Neo4j. The
+    bounded queue overlaps parsing with Bolt writes and caps buffered blocks.
+    """
     driver = get_driver()
     total = 0
+    dropped = 0
 
-    try:
-        with driver.session() as session:
-            for chunk in pd.read_csv(
+    q: "queue.Queue[Optional[list[dict[str, Any]]]]" = queue.Queue(maxsize=4)
+    errors: list[BaseException] = []
+    stop = threading.Event()
+    lock = threading.Lock()
+
+    def produce() -> None:
+        nonlocal dropped
+        try:
+            reader = pacsv.open_csv(
                 csv_path,
-                usecols=USECOLS,
-                chunksize=chunksize,
-                low_memory=False,
-            ):
-                # --- Standardize / basic cleaning for RAW layer ---
-                chunk["FL_DATE"] = pd.to_datetime(chunk["FL_DATE"], errors="coerce").dt.date
-
-                chunk["OP_CARRIER"] = chunk["OP_CARRIER"].astype(str).str.strip().str.upper()
-                chunk["ORIGIN"] = chunk["ORIGIN"].astype(str).str.strip().str.upper()
-                chunk["DEST"] = chunk["DEST"].astype(str).str.strip().str.upper()
-
-                # Drop missing required fields (RAW still needs minimally valid records)
-                chunk = chunk.dropna(subset=["FL_DATE", "OP_CARRIER", "ORIGIN", "DEST", "CRS_DEP_TIME"])
-
-                # Convert chunk to list of dicts for UNWIND
-                rows = chunk.to_dict(orient="records")
-                if not rows:
-                    continue
-
-                # Insert into Neo4j
-                session.run(
-                    """
-                    UNWIND $rows AS r
-                    CREATE (:RawFlight {
-                      fl_date: r.FL_DATE,
-                      carrier: r.OP_CARRIER,
-                      flight_num: toInteger(r.OP_CARRIER_FL_NUM),
-                      origin: r.ORIGIN,
-                      dest: r.DEST,
-                      crs_dep_time: toInteger(r.CRS_DEP_TIME),
-                      dep_delay: r.DEP_DELAY,
-                      arr_delay: r.ARR_DELAY,
-                      cancelled: toInteger(r.CANCELLED),
-                      diverted: toInteger(r.DIVERTED),
-                      distance: r.DISTANCE
-                    })
-                    """,
-                    rows=rows,
-                )
-
-                total += len(rows)
-                print(f"Inserted chunk: {len(rows)} | Total inserted: {total}")
-
-        print(f"\n✅ RAW ingestion complete. Total rows inserted: {total}")
-
-    finally:
-        driver.close()
+                read_options=pacsv.ReadOptions(block_size=block_size),
+                convert_options=pacsv.ConvertOptions(
+                    column_types=COLUMN_TYPES,
+                    include_columns=USECOLS,
+                    strings_can_be_null=True,
+                ),
+            )
+            for batch in reader:
+                if stop.is_set():
+                    break
+                # Arrow dates/nulls map straight onto Python date/None for UNWIND
+                rows = clean_batch(batch).to_pylist()
+                dropped += batch.num_rows - len(rows)
+                if rows:
+                    q.put(rows)
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            # One sentinel per consumer
+            for _ in range(workers):
+                q.put(None)
+
+    def consume() -> None:
+        nonlocal total
+        done = False
+        try:
+            with driver.session() as session:
+                while True:
+                    rows = q.get()
+                    if rows is None:
+                        done = True
+                        break
+                    if stop.is_set():
+                        # Keep draining so the producer never blocks on a full queue
+                        continue
+                    # Insert into Neo4j (server-side parallel batches)
+                    run_apoc_iterate(session, RAW_CYPHER, "RAW ingestion batch", rows=rows, batch_size=batch_size)
+
+                    with lock:
+                        total += len(rows)
+                        print(f"Inserted chunk: {len(rows)} | Total inserted: {total}")
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+            # Whatever failed (session open/close included), drain to this
+            # consumer's sentinel so the producer and the joins finish
+            while not done:
+                done = q.get() is None
+
+    threads = [threading.Thread(target=produce, name="raw-producer")]
+    threads += [threading.Thread(target=consume, name=f"raw-writer-{n}") for n in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    if errors:
+        raise errors[0]
+
+    if dropped:
+        print(f"⚠️ Dropped {dropped} rows with a missing or unparseable required field ({', '.join(REQUIRED)})")
+    print(f"\n✅ RAW ingestion complete. Total rows inserted: {total}")
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
@@ -1,3 +1,5 @@
+from neo4j import ManagedTransaction
+
 from db.neo4j_conn import get_driver
 
 QUERIES = [
@@ -6,12 +8,15 @@ QUERIES = [
     "CREATE CONSTRAINT IF NOT EXISTS FOR (f:Flight) REQUIRE f.flight_id IS UNIQUE",
 ]
 
+def _create_all(tx: ManagedTransaction) -> None:
+    for q in QUERIES:
+        tx.run(q).consume()
+
 def main() -> None:
     driver = get_driver()
     with driver.session() as s:
-        for q in QUERIES:
-            s.run(q)
-    driver.close()
+        # All constraints in one transaction: a single commit
+        s.execute_write(_create_all)
     print("✅ setup_schema ran successfully")
 
 if __name__ == "__main__":
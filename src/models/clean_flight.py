@@ -1,81 +1,53 @@
 from __future__ import annotations
 
 from datetime import date
-from typing import Optional
+from typing import Annotated, Any, Optional
 
-# Works with BOTH Pydantic v2 and v1
-try:
-    # Pydantic v2
-    from pydantic import BaseModel, ConfigDict, field_validator
-    PYDANTIC_V2 = True
-except ImportError:
-    # Pydantic v1
-    from pydantic import BaseModel, validator
-    PYDANTIC_V2 = False
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
 class CleanFlight(BaseModel):
+    """
+    Validated clean-layer flight record (Pydantic v2).
+
+    Range checks are declared on the fields so pydantic-core enforces them;
+    only the checks it cannot express are Python validators. For batches that
+    are already validated, use `CleanFlight.model_construct(...)` to skip
+    validation entirely.
+    """
+
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     flight_id: str
     fl_date: date
     carrier: str
     origin: str
     dest: str
-    crs_dep_time: int
+    cancelled: int
     dep_delay: Optional[float] = None
     arr_delay: Optional[float] = None
-    cancelled: int
-    diverted: int
-    distance: Optional[float] = None
-
-    if PYDANTIC_V2:
-        model_config = ConfigDict(extra="ignore")
-
-        @field_validator("crs_dep_time")
-        @classmethod
-        def validate_crs_dep_time(cls, v: int) -> int:
-            """
-            Valid HHMM time in 24h format:
-              - integer
-              - 0..2359
-              - minutes < 60
-            """
-            if not isinstance(v, int):
-                raise ValueError("crs_dep_time must be an integer HHMM (e.g., 930, 1430)")
-            if v < 0 or v > 2359:
-                raise ValueError("crs_dep_time must be between 0 and 2359")
-            if v % 100 >= 60:
-                raise ValueError("crs_dep_time minutes must be < 60")
-            return v
-
-        @field_validator("carrier", "origin", "dest")
-        @classmethod
-        def normalize_codes(cls, v: str) -> str:
-            if v is None:
-                raise ValueError("code cannot be null")
-            v = v.strip().upper()
-            if len(v) == 0:
-                raise ValueError("code cannot be empty")
-            return v
-
-    else:
-        class Config:
-            extra = "ignore"
-
-        @validator("crs_dep_time")
-        def validate_crs_dep_time(cls, v: int) -> int:
-            if not isinstance(v, int):
-                raise ValueError("crs_dep_time must be an integer HHMM (e.g., 930, 1430)")
-            if v < 0 or v > 2359:
-                raise ValueError("crs_dep_time must be between 0 and 2359")
-            if v % 100 >= 60:
-                raise ValueError("crs_dep_time minutes must be < 60")
-            return v
 
-        @validator("carrier", "origin", "dest", pre=True)
-        def normalize_codes(cls, v: str) -> str:
-            if v is None:
-                raise ValueError("code cannot be null")
-            v = str(v).strip().upper()
-            if len(v) == 0:
-                raise ValueError("code cannot be empty")
-            return v
+    # Not persisted by clean_load; still validated when a source provides them
+    crs_dep_time: Optional[Annotated[int, Field(ge=0, le=2359)]] = None
+    diverted: Optional[int] = None
+
+    @field_validator("crs_dep_time")
+    @classmethod
+    def validate_crs_dep_time(cls, v: Optional[int]) -> Optional[int]:
+        """
+        Valid HHMM time in 24h format: minutes < 60
+        (the 0..2359 range is enforced by the field constraint).
+        """
+        if v is not None and v % 100 >= 60:
+            raise ValueError("crs_dep_time minutes must be < 60")
+        return v
+
+    @field_validator("carrier", "origin", "dest", mode="before")
+    @classmethod
+    def normalize_codes(cls, v: Any) -> str:
+        if v is None:
+            raise ValueError("code cannot be null")
+        v = str(v).strip().upper()
+        if len(v) == 0:
+            raise ValueError("code cannot be empty")
+        return v
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+import random
 import time
 from typing import Any, Optional
 
@@ -30,47 +31,69 @@ def get_driver() -> Driver:
     )
 
 
-def run_query(
+def _run_query_uncached(
     q: str,
     params: Optional[dict[str, Any]] = None,
     retries: int = 3,
-    sleep_s: float = 1.0,
+    max_delay_s: float = 4.0,
 ) -> pd.DataFrame:
+    # Backoff like build_gold.wait_for_neo4j: each sleep capped at max_delay_s, none after the last try
     driver: Driver = get_driver()
 
     last_err: Optional[Exception] = None
-    for _ in range(retries):
+    delay = 0.25
+    for attempt in range(retries):
         try:
             with driver.session(database=NEO4J_DB) as session:
                 safe_params: Optional[dict[str, Any]] = dict(params) if params is not None else None
                 res = session.run(q, safe_params)
-                return pd.DataFrame([r.data() for r in res])
+                return res.to_df()
         except ServiceUnavailable as e:
             last_err = e
-            time.sleep(sleep_s)
+            if attempt + 1 < retries:
+                time.sleep(min(delay + random.uniform(0, delay * 0.5), max_delay_s))
+                delay = min(delay * 2, max_delay_s)
 
     raise RuntimeError("Neo4j query failed after retries") from last_err
 
 
+@st.cache_data(ttl=300, show_spinner=False)
+def run_query(q: str, params: Optional[dict[str, Any]] = None) -> pd.DataFrame:
+    # Gold data only changes on rebuild: reruns with the same (q, params) skip Neo4j
+    return _run_query_uncached(q, params)
+
+
 # --- Quick connection test ---
 with st.expander("Connection status"):
     try:
-        run_query("RETURN 1 AS ok;")
+        _run_query_uncached("RETURN 1 AS ok;")
         st.success(f"Connected ✅  URI={NEO4J_URI}  DB={NEO4J_DB}")
     except Exception as e:
         st.error("Neo4j connection failed.")
         st.code(str(e))
         st.stop()
 
+if st.button("Refresh data"):
+    run_query.clear()
+
 # --- Debug keys ---
 with st.expander("Debug: Show node property keys (Gold layer)"):
     try:
-        k1 = run_query("MATCH (r:RouteSummary) RETURN keys(r) AS keys LIMIT 1;")
-        k2 = run_query("MATCH (s:DailyCarrierSummary) RETURN keys(s) AS keys LIMIT 1;")
-        k3 = run_query("MATCH (m:MonthlyAirportSummary) RETURN keys(m) AS keys LIMIT 1;")
-        st.write("RouteSummary keys:", k1.to_dict("records"))
-        st.write("DailyCarrierSummary keys:", k2.to_dict("records"))
-        st.write("MonthlyAirportSummary keys:", k3.to_dict("records"))
+        # One round trip for all three labels; split client-side by label
+        keys_df = run_query(
+            """
+            MATCH (r:RouteSummary) WITH r LIMIT 1
+            RETURN "RouteSummary" AS label, keys(r) AS keys
+            UNION ALL
+            MATCH (s:DailyCarrierSummary) WITH s LIMIT 1
+            RETURN "DailyCarrierSummary" AS label, keys(s) AS keys
+            UNION ALL
+            MATCH (m:MonthlyAirportSummary) WITH m LIMIT 1
+            RETURN "MonthlyAirportSummary" AS label, keys(m) AS keys
+            """
+        )
+        for label in ("RouteSummary", "DailyCarrierSummary", "MonthlyAirportSummary"):
+            st.write(f"{label} keys:", keys_df[keys_df["label"] == label][["keys"]].to_dict("records"))
     except Exception as e:
         st.error(f"Debug query failed: {e}")
 
@@ -111,11 +134,12 @@ with col2:
         """
         MATCH (r:RouteSummary)
         WHERE r.flights >= $min_flights
+        WITH r
+        ORDER BY r.avg_arr_delay DESC
+        LIMIT 10
         RETURN r.origin AS origin, r.dest AS dest,
                r.avg_arr_delay AS avg_arr_delay,
                r.flights AS flights
-        ORDER BY avg_arr_delay DESC
-        LIMIT 10
         """,
         {"min_flights": int(min_flights)},
     )
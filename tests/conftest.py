@@ -3,3 +3,5 @@ from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT))
+# The ingest scripts run from src/ and import their siblings as top-level packages
+sys.path.insert(1, str(ROOT / "src"))
@@ -1,5 +1,115 @@
-from src.clean.clean_load import build_flight_id
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+from src.clean.clean_load import (
+    CLEAN_COLS,
+    CLEAN_CYPHER,
+    CLEAN_INNER,
+    CLEAN_OUTER,
+    build_clean_columns,
+    build_clean_rows,
+    build_flight_id,
+    build_flight_ids,
+    open_clean_csv,
+)
 
 def test_build_flight_id() -> None:
     fid = build_flight_id("2020-01-01", "AA", "EWR", "JFK", 5)
     assert fid.endswith("-0005")
+
+def test_build_flight_ids_matches_scalar() -> None:
+    df = pd.DataFrame(
+        {
+            "fl_date": ["2020-01-01", "2020-01-02"],
+            "op_carrier": ["aa ", "UA"],
+            "origin": ["EWR", " lga"],
+            "dest": ["JFK", "ORD"],
+            "crs_dep_time": [5, 1430.0],
+        }
+    )
+    expected = [
+        build_flight_id("2020-01-01", "aa ", "EWR", "JFK", 5),
+        build_flight_id("2020-01-02", "UA", " lga", "ORD", 1430),
+    ]
+    assert build_flight_ids(df).tolist() == expected
+
+def test_build_clean_rows() -> None:
+    chunk = pd.DataFrame(
+        {
+            "fl_date": ["2020-01-01", "2020-01-01"],
+            "carrier": ["AA", "UA"],
+            "op_carrier_fl_num": [12, 13],
+            "origin": ["EWR ", "LGA"],
+            "dest": ["JFK", None],
+            "cancelled": [0.0, 1.0],
+            "dep_delay": ["5", ""],
+        }
+    )
+    rows = build_clean_rows(chunk)
+    assert len(rows) == 1
+    assert rows[0]["flight_id"] == "2020-01-01_AA_12_EWR _JFK"
+    assert rows[0]["origin"] == "EWR"
+    assert rows[0]["cancelled"] == 0
+    assert "op_carrier_fl_num" not in rows[0]
+    assert rows[0]["dep_delay"] == 5.0
+    assert rows[0]["arr_delay"] is None
+
+def test_build_clean_rows_missing_id_part() -> None:
+    chunk = pd.DataFrame(
+        {
+            "fl_date": ["2020-01-01"],
+            "op_carrier": ["AA"],
+            "op_carrier_fl_num": [None],
+            "origin": ["EWR"],
+            "dest": ["JFK"],
+        }
+    )
+    rows = build_clean_rows(chunk)
+    assert rows[0]["flight_id"] == "2020-01-01_AA_None_EWR_JFK"
+
+def test_build_clean_columns() -> None:
+    chunk = pd.DataFrame(
+        {
+            "fl_date": ["2020-01-01", "2020-01-02", "2020-01-03"],
+            "carrier": ["AA", "UA", "DL"],
+            "op_carrier_fl_num": [12, 13, 14],
+            "origin": ["EWR", "LGA", "ATL"],
+            "dest": ["JFK", None, "LAX"],
+            "dep_delay": ["5", "", None],
+            "arr_delay": [1.5, 2.0, None],
+            "cancelled": [0.0, 1.0, None],
+        }
+    )
+    cols = build_clean_columns(chunk)
+    assert list(cols) == CLEAN_COLS
+    assert {len(v) for v in cols.values()} == {2}
+
+    # Co-indexed lists round-trip to the same records as build_clean_rows
+    rows = [{c: cols[c][i] for c in CLEAN_COLS} for i in range(len(cols["flight_id"]))]
+    assert rows == build_clean_rows(chunk)
+
+    assert cols["dep_delay"] == [5.0, None]
+    assert cols["arr_delay"] == [1.5, None]
+    assert cols["cancelled"] == [0, None]
+    assert type(cols["dep_delay"][0]) is float
+    assert type(cols["cancelled"][0]) is int
+
+def test_clean_cypher_zips_columns_into_rows() -> None:
+    # Outer statement rebuilds one map per row from the co-indexed lists
+    for c in CLEAN_COLS:
+        assert f"{c}: ${c}[i]" in CLEAN_OUTER
+    # Inner batches only touch their own row, never the chunk-wide params
+    assert "$" not in CLEAN_INNER
+    assert "row.flight_id" in CLEAN_INNER
+    assert CLEAN_OUTER in CLEAN_CYPHER and CLEAN_INNER in CLEAN_CYPHER
+
+def test_open_clean_csv_reads_alias_columns_as_strings(tmp_path: Path) -> None:
+    path = tmp_path / "flights.csv"
+    path.write_text("FL_DATE,Carrier,ORIGIN,DEST,DEP_DELAY,Unused\n2020-01-01,AA,EWR,JFK,5,x\n2020-01-02,UA,JFK,,,y\n")
+    tbl = open_clean_csv(str(path), block_size=1 << 16).read_all()
+    assert tbl.column_names == ["FL_DATE", "Carrier", "ORIGIN", "DEST", "DEP_DELAY"]
+    assert all(t == pa.string() for t in tbl.schema.types)
+    assert tbl["DEST"].to_pylist() == ["JFK", None]
+    assert tbl["DEP_DELAY"].to_pylist() == ["5", None]
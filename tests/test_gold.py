@@ -0,0 +1,88 @@
+import re
+
+import pandas as pd
+import pytest
+
+from src.aggregate import build_gold
+from src.aggregate.build_gold import (
+    FLIGHT_CARRIERS,
+    FLIGHT_SCAN_CARRIER,
+    plan_partitions,
+    summarize_base,
+    summarize_daily,
+    summarize_monthly,
+    summarize_routes,
+    wait_for_neo4j,
+)
+
+@pytest.fixture
+def flights() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "origin": ["EWR", "EWR", "JFK", None],
+            "dest": ["JFK", "JFK", "LAX", "ORD"],
+            "carrier": ["AA", "AA", "UA", "UA"],
+            "date": ["2020-01-01", "2020-01-02", "2020-01-02", "2020-02-01"],
+            "dep_delay": [10.0, None, 4.0, 2.0],
+            "arr_delay": [6.0, 2.0, None, 1.0],
+            "cancelled": [0.0, 1.0, None, 0.0],
+        }
+    )
+
+@pytest.fixture
+def base(flights: pd.DataFrame) -> pd.DataFrame:
+    return summarize_base(flights)
+
+def test_summarize_routes(base: pd.DataFrame) -> None:
+    routes = summarize_routes(base).set_index(["origin", "dest"])
+    assert len(routes) == 2
+    assert routes.loc[("EWR", "JFK"), "flights"] == 2
+    assert routes.loc[("EWR", "JFK"), "avg_arr_delay"] == 4.0
+    assert routes.loc[("EWR", "JFK"), "avg_dep_delay"] == 5.0
+
+def test_summarize_daily(base: pd.DataFrame) -> None:
+    daily = summarize_daily(base).set_index(["carrier", "date"])
+    assert len(daily) == 4
+    assert daily.loc[("AA", "2020-01-02"), "avg_dep_delay"] == 0.0
+
+def test_summarize_monthly(base: pd.DataFrame) -> None:
+    monthly = summarize_monthly(base).set_index(["airport", "month"])
+    assert len(monthly) == 2
+    assert monthly.loc[("EWR", "2020-01"), "flights"] == 2
+    assert monthly.loc[("EWR", "2020-01"), "cancel_rate"] == 0.5
+
+def test_carrier_partitions_combine(flights: pd.DataFrame, base: pd.DataFrame) -> None:
+    # Per-carrier bases (UA spans two routes and months) roll up like one scan
+    parts = [summarize_base(g) for _, g in flights.groupby("carrier")]
+    combined = pd.concat(parts, ignore_index=True)
+    expected = summarize_routes(base).sort_values(["origin", "dest"]).reset_index(drop=True)
+    actual = summarize_routes(combined).sort_values(["origin", "dest"]).reset_index(drop=True)
+    pd.testing.assert_frame_equal(actual, expected)
+
+def test_partition_queries_use_indexable_predicates() -> None:
+    # Equality / IS NOT NULL on op_carrier are served by the flight_op_carrier index
+    for query, predicate in (
+        (FLIGHT_SCAN_CARRIER, "f.op_carrier = $carrier"),
+        (FLIGHT_CARRIERS, "f.op_carrier IS NOT NULL"),
+    ):
+        where = re.search(r"WHERE (.*?)\s*RETURN", query, re.S)
+        assert where is not None
+        assert where.group(1).strip() == predicate
+
+def test_plan_partitions_adds_null_carrier_only_when_needed() -> None:
+    assert plan_partitions({"AA": 2, "UA": 1}, 3) == ["AA", "UA"]
+    assert plan_partitions({"AA": 2, "UA": 1}, 4) == ["AA", "UA", None]
+
+class DownDriver:
+    def verify_connectivity(self) -> None:
+        raise OSError("connection refused")
+
+def test_wait_for_neo4j_backoff_sequence(monkeypatch: pytest.MonkeyPatch) -> None:
+    sleeps: list[float] = []
+    monkeypatch.setattr(build_gold.time, "sleep", sleeps.append)
+    # Max jitter, so the cap is what bounds the later sleeps
+    monkeypatch.setattr(build_gold.random, "uniform", lambda lo, hi: hi)
+    with pytest.raises(RuntimeError, match="not reachable"):
+        wait_for_neo4j(DownDriver(), attempts=6, max_delay_s=2.0)  # type: ignore[arg-type]
+    # No sleep after the final attempt
+    assert sleeps == [0.375, 0.75, 1.5, 2.0, 2.0]
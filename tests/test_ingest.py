@@ -0,0 +1,85 @@
+import datetime as dt
+import threading
+from pathlib import Path
+
+import pyarrow as pa
+import pytest
+
+from ingest import ingest_raw
+from ingest.ingest_raw import COLUMN_TYPES, clean_batch
+
+def make_batch(**cols: list) -> pa.RecordBatch:
+    base = {
+        "FL_DATE": ["2018-01-02"],
+        "OP_CARRIER": ["AA"],
+        "OP_CARRIER_FL_NUM": [5],
+        "ORIGIN": ["EWR"],
+        "DEST": ["JFK"],
+        "CRS_DEP_TIME": [900],
+        "DEP_DELAY": [1.0],
+        "ARR_DELAY": [2.0],
+        "CANCELLED": [0.0],
+        "DIVERTED": [0.0],
+    }
+    base.update(cols)
+    n = len(next(iter(cols.values()))) if cols else 1
+    data = {k: v if len(v) == n else v * n for k, v in base.items()}
+    return pa.RecordBatch.from_pydict(data, schema=pa.schema(list(COLUMN_TYPES.items())))
+
+def test_clean_batch_parses_iso_and_us_dates() -> None:
+    batch = make_batch(FL_DATE=["2018-01-02", "1/2/2018", "01/02/2018 12:00:00 AM", " 2018-1-2 "])
+    out = clean_batch(batch)
+    assert out.num_rows == 4
+    assert out["FL_DATE"].to_pylist() == [dt.date(2018, 1, 2)] * 4
+
+def test_clean_batch_normalizes_codes() -> None:
+    out = clean_batch(make_batch(OP_CARRIER=[" aa "], ORIGIN=["ewr"], DEST=["jfk "]))
+    row = out.to_pylist()[0]
+    assert (row["OP_CARRIER"], row["ORIGIN"], row["DEST"]) == ("AA", "EWR", "JFK")
+
+def test_clean_batch_drops_missing_required() -> None:
+    batch = make_batch(FL_DATE=["2018-01-02", "not a date", "2018-01-03"], ORIGIN=["EWR", "EWR", None])
+    out = clean_batch(batch)
+    assert out["FL_DATE"].to_pylist() == [dt.date(2018, 1, 2)]
+
+class FakeSession:
+    def __enter__(self) -> "FakeSession":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+    def run(self, *args: object, **kwargs: object) -> None:
+        raise RuntimeError("write failed")
+
+class FakeDriver:
+    def __init__(self, fail_open: bool) -> None:
+        self.fail_open = fail_open
+
+    def session(self) -> FakeSession:
+        if self.fail_open:
+            raise RuntimeError("session failed")
+        return FakeSession()
+
+@pytest.mark.parametrize("fail_open", [False, True])
+def test_main_reraises_consumer_failure(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, fail_open: bool) -> None:
+    path = tmp_path / "flights.csv"
+    header = ",".join(COLUMN_TYPES)
+    row = "2018-01-02,AA,5,EWR,JFK,900,1.0,2.0,0.0,0.0"
+    # Many small blocks so the producer outruns the bounded queue
+    path.write_text(header + "\n" + "\n".join([row] * 200) + "\n")
+    monkeypatch.setattr(ingest_raw, "get_driver", lambda: FakeDriver(fail_open))
+
+    errors: list[BaseException] = []
+
+    def run() -> None:
+        try:
+            ingest_raw.main(str(path), block_size=256, batch_size=10, workers=2)
+        except BaseException as e:
+            errors.append(e)
+
+    t = threading.Thread(target=run, daemon=True)
+    t.start()
+    t.join(timeout=10)
+    assert not t.is_alive(), "main hung after a consumer failure"
+    assert len(errors) == 1 and isinstance(errors[0], RuntimeError)
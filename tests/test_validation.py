@@ -14,7 +14,6 @@ def test_clean_flight_valid() -> None:
         arr_delay=3.0,
         cancelled=0,
         diverted=0,
-        distance=20.0,
     )
     assert f.origin == "EWR"
 
@@ -31,5 +30,33 @@ def test_clean_flight_invalid_time() -> None:
             arr_delay=None,
             cancelled=0,
             diverted=0,
-            distance=None,
         )
+
+def test_clean_flight_invalid_minutes() -> None:
+    with pytest.raises(Exception):
+        CleanFlight(
+            flight_id="x",
+            fl_date=date(2020, 1, 1),
+            carrier="AA",
+            origin="EWR",
+            dest="JFK",
+            crs_dep_time=975,  # minutes >= 60
+            cancelled=0,
+            diverted=0,
+        )
+
+def test_clean_flight_clean_layer_fields_only() -> None:
+    # Exactly the properties clean_load persists (op_carrier maps to carrier)
+    f = CleanFlight(
+        flight_id="2020-01-01_AA_12_EWR_JFK",
+        fl_date=date(2020, 1, 1),
+        carrier="aa",
+        origin="EWR",
+        dest="JFK",
+        dep_delay=None,
+        arr_delay=1.5,
+        cancelled=0,
+    )
+    assert f.carrier == "AA"
+    assert f.crs_dep_time is None
+    assert f.diverted is None